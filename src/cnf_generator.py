@@ -1,10 +1,23 @@
 from itertools import combinations
 
+ENCODINGS = ("pairwise", "support", "sequential")
+
+
 class CNFGenerator:
-    def __init__(self, G_log, G_phys, allow_shared_physical=False):
+    """
+    Encoding disponibili:
+    - pairwise:   at-most-one a coppie, edge consistency a coppie (originale)
+    - support:    at-most-one a coppie, edge consistency con clausole di supporto
+    - sequential: at-most-one con contatore sequenziale (Sinz), edge consistency con supporto
+    """
+    def __init__(self, G_log, G_phys, allow_shared_physical=False, encoding="pairwise"):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Encoding non valido: {encoding}")
+
         self.G_log = G_log
         self.G_phys = G_phys
         self.allow_shared_physical = allow_shared_physical
+        self.encoding = encoding
 
         # Ordinamento dei nodi
         self.logical_nodes = list(sorted(G_log.nodes()))
@@ -29,11 +42,32 @@ class CNFGenerator:
         """Restituisce l'id della variabile SAT x{i,a}"""
         return self.var_map[(i, a)]
 
+    def new_var(self):
+        """Alloca una variabile ausiliaria dopo quelle x{i,a}"""
+        self.num_vars += 1
+        return self.num_vars
+
     def add_clause(self, lits, ctype="generic"):
         """Aggiunge clausola con tipo"""
         self.clauses.append(lits)
         self.clause_type.append(ctype)
 
+    def encode_at_most_one(self, lits, ctype):
+        """At-most-one sui letterali dati, secondo l'encoding scelto"""
+        if self.encoding != "sequential" or len(lits) < 3:
+            for u, v in combinations(lits, 2):
+                self.add_clause([-u, -v], ctype)
+            return
+
+        # Contatore sequenziale: s_k ⇔ "uno tra lits[0..k] è vero"
+        s = [self.new_var() for _ in range(len(lits) - 1)]
+        self.add_clause([-lits[0], s[0]], ctype)
+        for k in range(1, len(lits) - 1):
+            self.add_clause([-lits[k], s[k]], ctype)
+            self.add_clause([-s[k - 1], s[k]], ctype)
+            self.add_clause([-lits[k], -s[k - 1]], ctype)
+        self.add_clause([-lits[-1], -s[-1]], ctype)
+
     # ----------------------------------------------------------------------
     # 1) Ogni nodo logico deve mappare esattamente su un nodo fisico
     # ----------------------------------------------------------------------
@@ -43,9 +77,8 @@ class CNFGenerator:
             lits = [self.x(i, a) for a in self.physical_nodes]
             self.add_clause(lits, "at_least_one")
 
-            # al massimo uno (pairwise)
-            for a, b in combinations(self.physical_nodes, 2):
-                self.add_clause([-self.x(i, a), -self.x(i, b)], "at_most_one")
+            # al massimo uno
+            self.encode_at_most_one([self.x(i, a) for a in self.physical_nodes], "at_most_one")
 
     # ----------------------------------------------------------------------
     # 2) Nessuna condivisione del nodo fisico (optional)
@@ -55,13 +88,16 @@ class CNFGenerator:
             return
 
         for a in self.physical_nodes:
-            for i, j in combinations(self.logical_nodes, 2):
-                self.add_clause([-self.x(i, a), -self.x(j, a)], "mutual_exclusion")
+            self.encode_at_most_one([self.x(i, a) for i in self.logical_nodes], "mutual_exclusion")
 
     # ----------------------------------------------------------------------
     # 3) Edge consistency
     # ----------------------------------------------------------------------
     def encode_edge_consistency(self):
+        if self.encoding != "pairwise":
+            self.encode_edge_support()
+            return
+
         phys_edges = set(tuple(sorted(e)) for e in self.G_phys.edges())
 
         for i, j in self.G_log.edges():
@@ -70,6 +106,17 @@ class CNFGenerator:
                     if a == b or (min(a, b), max(a, b)) not in phys_edges:
                         self.add_clause([-self.x(i, a), -self.x(j, b)], "edge_consistency")
 
+    def encode_edge_support(self):
+        """
+        x{i,a} → OR_{b ∈ N(a)} x{j,b} per ogni arco logico, in entrambi i versi.
+        Equivalente alla versione a coppie dato exactly-one su j.
+        """
+        for i, j in self.G_log.edges():
+            for u, v in ((i, j), (j, i)):
+                for a in self.physical_nodes:
+                    lits = [self.x(v, b) for b in sorted(self.G_phys.neighbors(a)) if b != a]
+                    self.add_clause([-self.x(u, a)] + lits, "edge_consistency")
+
     # ----------------------------------------------------------------------
     # Generazione CNF
     # ----------------------------------------------------------------------
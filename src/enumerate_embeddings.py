@@ -0,0 +1,189 @@
+import json
+import multiprocessing as mp
+import threading
+import time
+import traceback
+
+from networkx.algorithms.isomorphism import GraphMatcher
+from pysat.solvers import Glucose4
+
+from solver_interface import limit_address_space
+
+
+# ================================================================
+#  SIMMETRIE DEL GRAFO LOGICO
+# ================================================================
+def logical_automorphisms(G_log, max_count=1000):
+    """
+    Automorfismi di G_log (al più `max_count`), come dizionari i → σ(i).
+    Comporre un embedding con un automorfismo dà un piazzamento equivalente
+    (stessi qubit e stessi accoppiatori fisici usati).
+    Restituisce (automorfismi, troncato): se troncato è True il gruppo ha più
+    di `max_count` elementi e le orbite vengono bloccate solo in parte.
+    """
+    autos = []
+    for sigma in GraphMatcher(G_log, G_log).isomorphisms_iter():
+        if len(autos) >= max_count:
+            return autos, True
+        autos.append(sigma)
+    return autos, False
+
+
+# ================================================================
+#  ENUMERAZIONE INCREMENTALE
+# ================================================================
+def enumerate_embeddings(gen, max_count=None, time_budget=None, block_orbits=False, stats=None,
+                         max_automorphisms=1000):
+    """
+    Generatore di embedding distinti per un CNFGenerator già generato.
+    - Un solo solver incrementale: dopo ogni modello si aggiunge una clausola
+      bloccante sulle sole variabili x(i,a).
+    - `max_count` limita il numero di soluzioni, `time_budget` (secondi)
+      il tempo totale; il solver viene interrotto allo scadere.
+    - Con `block_orbits` ogni soluzione blocca l'intera orbita rispetto agli
+      automorfismi di G_log, così si enumera un rappresentante per classe
+      (al più `max_automorphisms` automorfismi per orbita).
+    - Raggiunto `max_count` si fa un'ultima chiamata al solver (senza produrre
+      la soluzione) per sapere se lo spazio è esaurito.
+    - Se passato, `stats` riceve "exhausted": True quando non esistono altre
+      soluzioni, "interrupted": True se il budget di tempo è scaduto e
+      "orbits_truncated": True se il gruppo è stato troncato
+      (in quel caso le soluzioni non sono un rappresentante per orbita).
+    """
+    autos, truncated = [None], False
+    if block_orbits:
+        autos, truncated = logical_automorphisms(gen.G_log, max_automorphisms)
+        # Il modello stesso va sempre bloccato, anche se l'identità è stata troncata
+        autos = [None] + [s for s in autos if any(s[k] != k for k in s)]
+    rev = {vid: (i, a) for (i, a), vid in gen.var_map.items()}
+
+    solver = Glucose4(bootstrap_with=gen.clauses)
+    deadline = time.time() + time_budget if time_budget is not None else None
+    count = 0
+    if stats is not None:
+        stats["exhausted"] = False
+        stats["interrupted"] = False
+        stats["orbits_truncated"] = truncated
+
+    try:
+        while True:
+            timer = None
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    if stats is not None:
+                        stats["interrupted"] = True
+                    break
+                timer = threading.Timer(remaining, solver.interrupt)
+                timer.start()
+
+            sat = solver.solve_limited(expect_interrupt=True)
+            if timer:
+                timer.cancel()
+            # None = interrotto, False = spazio esaurito
+            if not sat:
+                if stats is not None:
+                    stats["exhausted" if sat is False else "interrupted"] = True
+                break
+            # Esiste almeno un'altra soluzione oltre max_count: non esaurito
+            if max_count is not None and count >= max_count:
+                break
+
+            mapping = dict(rev[lit] for lit in solver.get_model() if lit in rev)
+            count += 1
+            yield mapping
+
+            for sigma in autos:
+                image = mapping if sigma is None else {i: mapping[sigma[i]] for i in mapping}
+                solver.add_clause([-gen.x(i, a) for i, a in image.items()])
+            solver.clear_interrupt()
+    finally:
+        solver.delete()
+
+
+def write_embeddings_stream(embeddings, path):
+    """
+    Scrive gli embedding uno per riga (JSON Lines) man mano che arrivano.
+    Restituisce il numero di embedding scritti.
+    """
+    count = 0
+    with open(path, 'w') as f:
+        for mapping in embeddings:
+            f.write(json.dumps({str(k): v for k, v in mapping.items()}) + "\n")
+            f.flush()
+            count += 1
+    return count
+
+
+# ================================================================
+#  ENUMERAZIONE IN UN PROCESSO SEPARATO
+# ================================================================
+def _enumeration_process(gen, path, options, memory_limit_mb, return_dict):
+    try:
+        limit_address_space(memory_limit_mb)
+        stats = {}
+
+        def keep_first(embeddings):
+            for mapping in embeddings:
+                if "first" not in return_dict:
+                    return_dict["first"] = mapping
+                yield mapping
+
+        write_embeddings_stream(keep_first(enumerate_embeddings(gen, stats=stats, **options)), path)
+        return_dict.update(stats)
+    except Exception:
+        return_dict["error"] = traceback.format_exc()
+
+
+# Tempo concesso al figlio oltre time_budget (caricamento CNF, automorfismi)
+ENUMERATION_GRACE_SECONDS = 30
+
+
+def run_enumeration(gen, path, memory_limit_mb=None, **options):
+    """
+    Esegue enumerate_embeddings in un processo figlio sotto RLIMIT_AS
+    (`memory_limit_mb`), scrivendo gli embedding in `path` (JSON Lines).
+    `options` sono passate a enumerate_embeddings (max_count, time_budget, ...).
+    Se il figlio non termina entro time_budget + ENUMERATION_GRACE_SECONDS
+    viene terminato. Anche se il figlio muore, gli embedding già scritti
+    restano nel file.
+    """
+    manager = mp.Manager()
+    return_dict = manager.dict()
+
+    time_budget = options.get("time_budget")
+    join_timeout = time_budget + ENUMERATION_GRACE_SECONDS if time_budget is not None else None
+
+    p = mp.Process(target=_enumeration_process,
+                   args=(gen, path, options, memory_limit_mb, return_dict))
+    start = time.time()
+    p.start()
+    p.join(join_timeout)
+
+    timed_out = p.is_alive()
+    if timed_out:
+        p.terminate()
+        p.join()
+    time_elapsed = time.time() - start
+
+    error = return_dict.get("error")
+    if timed_out:
+        error = "Time budget expired (enumeration process terminated)"
+    elif error is None and p.exitcode != 0:
+        error = f"Enumeration process crashed (exit code {p.exitcode})"
+
+    try:
+        with open(path) as f:
+            count = sum(1 for _ in f)
+    except OSError:
+        count = 0
+
+    return {
+        "count": count,
+        "first": return_dict.get("first"),
+        "exhausted": return_dict.get("exhausted", False),
+        "interrupted": timed_out or return_dict.get("interrupted", False),
+        "orbits_truncated": return_dict.get("orbits_truncated", False),
+        "time": time_elapsed,
+        "error": error
+    }
@@ -7,6 +7,10 @@ from parser import read_graph
 from cnf_generator import CNFGenerator
 from solver_interface import solve_dimacs_file
 from metrics import write_experiment_output
+from region_search import search_regions
+from heuristic import run_heuristic
+from enumerate_embeddings import run_enumeration
+from size_model import select_encoding
 from utils import ensure_dir
 from plot_utils import plot_embedding  # funzioni di plotting importate
 
@@ -17,20 +21,178 @@ def run_experiment(cfg):
 
     timeout = cfg.get('timeout_seconds', None)
     allow_shared = cfg.get('allow_shared_physical_qubits', False)
+    enumerate_mode = cfg.get('enumerate', False)
+    requested_encoding = cfg.get('encoding', 'auto')
+    max_memory = cfg.get('max_memory_mb', None)
+    memory_limit = cfg.get('solver_memory_limit_mb', max_memory)
 
     exp_dir = os.path.join('outputs', str(exp_id))
     ensure_dir(exp_dir)
 
+    # In modalità enumerazione servono tutte le soluzioni sull'intero grafo:
+    # euristica e ricerca per regioni (che si fermano alla prima) vengono saltate
+    if enumerate_mode and (cfg.get('heuristic', False) or cfg.get('region_search', False)):
+        print("[INFO] Enumerazione attiva: euristica e ricerca per regioni disattivate")
+
+    # ----- EURISTICA VELOCE (opzionale) -----
+    heur = None
+    if cfg.get('heuristic', False) and not enumerate_mode:
+        heur = run_heuristic(G_log, G_phys, allow_shared=allow_shared,
+                             timeout_seconds=cfg.get('heuristic_timeout_seconds', 1.0))
+        if heur['status'] == 'SAT':
+            out_file = write_experiment_output(
+                exp_id, cfg, G_log, G_phys,
+                None, None, None,
+                'heuristic', 0.0, heur['time'],
+                'SAT',
+                solution=heur['solution'],
+                engine=f"heuristic-{heur['method']}",
+                output_dir=exp_dir
+            )
+            print(f"[INFO] Embedding trovato dall'euristica ({heur['method']})")
+            print(f"[INFO] Saved results to {out_file}")
+            plot_embedding(G_log, G_phys, heur['solution'], exp_dir, exp_id)
+            return out_file
+
+    # ----- RICERCA PER REGIONI (opzionale) -----
+    region_info = None
+    if cfg.get('region_search', False) and not enumerate_mode:
+        search = search_regions(
+            G_log, G_phys, allow_shared=allow_shared,
+            timeout=cfg.get('region_timeout_seconds', timeout),
+            max_radius=cfg.get('region_max_radius', None),
+            max_windows=cfg.get('region_max_windows', 32),
+            max_size=cfg.get('region_max_size', None),
+            workers=cfg.get('region_workers', None),
+            encoding=requested_encoding
+        )
+        best = search['best']
+        region_info = {
+            "num_candidates": search['num_candidates'],
+            "num_tried": search['num_tried'],
+            "fallback_full_graph": best is None,
+            "nodes": best['nodes'] if best else None,
+            "time_candidates": search['time_candidates'],
+            "time_solve": search['time_solve'],
+            "time_total": search['time_total'],
+            # Somme sulle finestre in parallelo (incluse quelle interrotte): solo diagnostica
+            "window_time_cnf_sum": search['window_time_cnf_sum'],
+            "window_time_sat_sum": search['window_time_sat_sum']
+        }
+
+        if best:
+            out_file = write_experiment_output(
+                exp_id, cfg, G_log, G_phys,
+                best['num_vars'], best['num_clauses'], best['encoding'],
+                'glucose', search['time_candidates'], search['time_solve'],
+                'SAT',
+                solution=best['solution'],
+                region=region_info,
+                engine='region',
+                output_dir=exp_dir
+            )
+            print(f"[INFO] Embedding trovato in una regione di {len(best['nodes'])} nodi")
+            print(f"[INFO] Saved results to {out_file}")
+            plot_embedding(G_log, G_phys, best['solution'], exp_dir, exp_id)
+            return out_file
+
+        print("[INFO] Nessuna regione SAT, fallback sull'intero grafo fisico")
+
+    # ----- STIMA DIMENSIONE E SCELTA ENCODING -----
+    sel = select_encoding(G_log, G_phys, allow_shared,
+                          requested=requested_encoding, max_memory_mb=max_memory)
+    size_info = {
+        "requested_encoding": requested_encoding,
+        "selected_encoding": sel['encoding'],
+        "downgraded": sel['downgraded'],
+        "max_memory_mb": max_memory,
+        "estimates": sel['estimates']
+    }
+
+    if sel['refused']:
+        cheapest = min(e['memory_mb'] for e in sel['estimates'].values())
+        out_file = write_experiment_output(
+            exp_id, cfg, G_log, G_phys,
+            None, None, None,
+            'glucose', 0.0, 0.0,
+            'SKIPPED',
+            solver_error=f"Estimated memory {cheapest:.0f} MB exceeds max_memory_mb={max_memory}",
+            region=region_info,
+            size_model=size_info,
+            output_dir=exp_dir
+        )
+        print(f"[WARN] Esperimento {exp_id} saltato: memoria stimata {cheapest:.0f} MB > {max_memory} MB")
+        print(f"[INFO] Saved results to {out_file}")
+        return out_file
+
+    if sel['downgraded']:
+        print(f"[WARN] Encoding {requested_encoding} oltre il limite di memoria, uso {sel['encoding']}")
+
     # ----- GENERA CNF -----
     t0 = time.time()
-    gen = CNFGenerator(G_log, G_phys, allow_shared_physical=allow_shared)
+    gen = CNFGenerator(G_log, G_phys, allow_shared_physical=allow_shared, encoding=sel['encoding'])
     num_vars, num_clauses = gen.generate()
     dimacs_path = os.path.join(exp_dir, f"exp_{exp_id}.cnf")
     gen.write_dimacs(dimacs_path)
     t1 = time.time()
 
+    # ----- ENUMERAZIONE DI TUTTI GLI EMBEDDING (opzionale) -----
+    if enumerate_mode:
+        stream_path = os.path.join(exp_dir, f"exp_{exp_id}_embeddings.jsonl")
+        enum = run_enumeration(
+            gen, stream_path,
+            memory_limit_mb=memory_limit,
+            max_count=cfg.get('enumerate_max_count', None),
+            time_budget=cfg.get('enumerate_time_budget_seconds', timeout),
+            block_orbits=cfg.get('enumerate_block_orbits', False),
+            max_automorphisms=cfg.get('enumerate_max_automorphisms', 1000)
+        )
+        count = enum['count']
+        solver_error = enum['error']
+
+        if count:
+            status = 'SAT'
+        else:
+            status = 'UNSAT' if enum['exhausted'] else 'ERROR'
+            if status == 'ERROR' and solver_error is None and enum['interrupted']:
+                solver_error = "Time budget expired"
+
+        out_file = write_experiment_output(
+            exp_id, cfg, G_log, G_phys,
+            num_vars, num_clauses, gen.encoding,
+            'glucose', t1 - t0, enum['time'],
+            status,
+            solution=enum['first'],
+            solver_error=solver_error,
+            region=region_info,
+            size_model=size_info,
+            enumeration={
+                "count": count,
+                # Con orbite troncate la lista non è un rappresentante per orbita
+                "complete": enum['exhausted'] and not enum['orbits_truncated'],
+                "block_orbits": cfg.get('enumerate_block_orbits', False),
+                "orbits_truncated": enum['orbits_truncated'],
+                "path": stream_path
+            },
+            output_dir=exp_dir
+        )
+        print(f"[INFO] Enumerati {count} embedding in {stream_path}")
+        if enum['orbits_truncated']:
+            print("[WARN] Gruppo di automorfismi troncato: orbite bloccate solo in parte "
+                  "(aumentare enumerate_max_automorphisms)")
+        print(f"[INFO] Saved results to {out_file}")
+        plot_embedding(G_log, G_phys, enum['first'], exp_dir, exp_id)
+        return out_file
+
     # ----- RISOLVI SAT -----
-    res = solve_dimacs_file(dimacs_path, timeout_seconds=timeout, cnf_gen=gen)
+    # Warm start: l'assegnamento parziale dell'euristica diventa la fase iniziale
+    phases = None
+    if heur and heur.get('partial'):
+        phases = [gen.x(i, a) if heur['partial'].get(i) == a else -gen.x(i, a)
+                  for i in gen.logical_nodes for a in gen.physical_nodes]
+
+    res = solve_dimacs_file(dimacs_path, timeout_seconds=timeout, cnf_gen=gen, phases=phases,
+                            memory_limit_mb=memory_limit)
 
     solution_map = None
     unsat_clauses_serializable = None
@@ -53,12 +215,14 @@ def run_experiment(cfg):
     # ----- Salva JSON risultato -----
     out_file = write_experiment_output(
         exp_id, cfg, G_log, G_phys,
-        num_vars, num_clauses, 'pairwise',
+        num_vars, num_clauses, gen.encoding,
         'glucose', t1 - t0, res.get('time', 0.0),
         res.get('status', 'ERROR'),
         solution=solution_map,
         unsat_clauses=unsat_clauses_serializable,
         solver_error=res.get('error'),
+        region=region_info,
+        size_model=size_info,
         output_dir=exp_dir
     )
     print(f"[INFO] Saved results to {out_file}")
@@ -66,6 +230,8 @@ def run_experiment(cfg):
     # ----- Plot embedding -----
     plot_embedding(G_log, G_phys, solution_map, exp_dir, exp_id)
 
+    return out_file
+
 
 # ================================================================
 #  ENTRY POINT
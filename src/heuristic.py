@@ -0,0 +1,222 @@
+import multiprocessing as mp
+import random
+import time
+import traceback
+
+from networkx.algorithms.isomorphism import GraphMatcher
+
+
+# ================================================================
+#  VALUTAZIONE DI UN ASSEGNAMENTO
+# ================================================================
+def count_violations(G_log, G_phys, mapping):
+    """
+    Numero di archi logici (con entrambi gli estremi assegnati) che non
+    cadono su un arco fisico.
+    """
+    bad = 0
+    for i, j in G_log.edges():
+        if i in mapping and j in mapping:
+            a, b = mapping[i], mapping[j]
+            if a == b or not G_phys.has_edge(a, b):
+                bad += 1
+    return bad
+
+
+def _node_violations(G_log, G_phys, mapping, i, a):
+    return sum(
+        1 for j in G_log.neighbors(i)
+        if j in mapping and j != i and (mapping[j] == a or not G_phys.has_edge(a, mapping[j]))
+    )
+
+
+# ================================================================
+#  GREEDY ORDINATO PER GRADO + RIPARAZIONE LOCALE
+# ================================================================
+def _degree_order(G_log, rng):
+    """
+    Visita BFS partendo dai nodi di grado massimo: ogni nodo viene piazzato
+    quando almeno un suo vicino è già stato piazzato.
+    """
+    order = []
+    seen = set()
+    roots = sorted(G_log.nodes(), key=lambda v: (-G_log.degree(v), rng.random()))
+    for root in roots:
+        if root in seen:
+            continue
+        seen.add(root)
+        queue = [root]
+        while queue:
+            v = queue.pop(0)
+            order.append(v)
+            nbrs = sorted(G_log.neighbors(v), key=lambda u: (-G_log.degree(u), rng.random()))
+            for u in nbrs:
+                if u not in seen:
+                    seen.add(u)
+                    queue.append(u)
+    return order
+
+
+def greedy_placement(G_log, G_phys, allow_shared=False, rng=None):
+    """
+    Piazza i nodi logici uno alla volta sul nodo fisico che soddisfa più archi
+    verso i vicini già piazzati (a parità, grado fisico più alto).
+    """
+    rng = rng or random.Random(0)
+    mapping = {}
+    used = set()
+
+    for i in _degree_order(G_log, rng):
+        placed_nbrs = [mapping[j] for j in G_log.neighbors(i) if j in mapping]
+        if placed_nbrs:
+            candidates = set()
+            for a in placed_nbrs:
+                candidates.update(G_phys.neighbors(a))
+        else:
+            candidates = set(G_phys.nodes())
+        if not allow_shared:
+            candidates -= used
+        if not candidates:
+            candidates = set(G_phys.nodes()) if allow_shared else set(G_phys.nodes()) - used
+        if not candidates:
+            break
+
+        best = min(candidates, key=lambda a: (
+            _node_violations(G_log, G_phys, mapping, i, a),
+            -G_phys.degree(a),
+            rng.random()
+        ))
+        mapping[i] = best
+        used.add(best)
+
+    return mapping
+
+
+def local_repair(G_log, G_phys, mapping, allow_shared=False, deadline=None, max_steps=1000):
+    """
+    Sposta (o scambia) i nodi coinvolti in archi violati finché il numero di
+    violazioni diminuisce.
+    """
+    mapping = dict(mapping)
+    violations = count_violations(G_log, G_phys, mapping)
+
+    for _ in range(max_steps):
+        if violations == 0 or (deadline is not None and time.time() > deadline):
+            break
+
+        improved = False
+        bad_nodes = {v for i, j in G_log.edges()
+                     if mapping.get(i) is not None and mapping.get(j) is not None
+                     and (mapping[i] == mapping[j] or not G_phys.has_edge(mapping[i], mapping[j]))
+                     for v in (i, j)}
+        owner = {a: i for i, a in mapping.items()}
+
+        for i in sorted(bad_nodes, key=str):
+            for a in G_phys.nodes():
+                if a == mapping[i]:
+                    continue
+                trial = dict(mapping)
+                other = owner.get(a)
+                if other is not None and not allow_shared:
+                    trial[other] = mapping[i]
+                trial[i] = a
+                v = count_violations(G_log, G_phys, trial)
+                if v < violations:
+                    mapping, violations, improved = trial, v, True
+                    break
+            if improved:
+                break
+
+        if not improved:
+            break
+
+    return mapping, violations
+
+
+# ================================================================
+#  VF2 (SUBGRAPH MONOMORPHISM)
+# ================================================================
+def vf2_placement(G_log, G_phys):
+    """
+    Restituisce un embedding logico → fisico via VF2, oppure None.
+    Non termina in tempo limitato: va eseguito con un timeout esterno.
+    """
+    gm = GraphMatcher(G_phys, G_log)
+    for phys_to_log in gm.subgraph_monomorphisms_iter():
+        return {i: a for a, i in phys_to_log.items()}
+    return None
+
+
+# ================================================================
+#  PROCESSO EURISTICO CON BUDGET
+# ================================================================
+def _heuristic_process(G_log, G_phys, allow_shared, budget, return_dict):
+    try:
+        start = time.time()
+        deadline = start + budget / 2.0 if budget else None
+        rng = random.Random(0)
+
+        # 1) Greedy + riparazione con restart, per metà del budget
+        restarts = 0
+        while True:
+            mapping = greedy_placement(G_log, G_phys, allow_shared, rng)
+            mapping, violations = local_repair(G_log, G_phys, mapping, allow_shared, deadline)
+            complete = len(mapping) == G_log.number_of_nodes()
+
+            best = return_dict.get("violations")
+            if complete and (best is None or violations < best):
+                return_dict["partial"] = mapping
+                return_dict["violations"] = violations
+
+            if complete and violations == 0:
+                return_dict["method"] = "greedy"
+                return_dict["solution"] = mapping
+                return
+            restarts += 1
+            if deadline is None or time.time() > deadline or restarts > 100:
+                break
+
+        # 2) VF2: solo senza condivisione (il monomorfismo è iniettivo)
+        if not allow_shared:
+            mapping = vf2_placement(G_log, G_phys)
+            if mapping is not None:
+                return_dict["method"] = "vf2"
+                return_dict["solution"] = mapping
+                return_dict["partial"] = mapping
+                return_dict["violations"] = 0
+
+    except Exception:
+        return_dict["error"] = traceback.format_exc()
+
+
+def run_heuristic(G_log, G_phys, allow_shared=False, timeout_seconds=1.0):
+    """
+    Cerca un embedding con le euristiche entro `timeout_seconds`.
+    Restituisce sempre il miglior assegnamento parziale trovato,
+    utile come fase iniziale per il solver SAT.
+    """
+    manager = mp.Manager()
+    return_dict = manager.dict()
+
+    p = mp.Process(target=_heuristic_process,
+                   args=(G_log, G_phys, allow_shared, timeout_seconds, return_dict))
+    start = time.time()
+    p.start()
+    p.join(timeout_seconds)
+
+    if p.is_alive():
+        p.terminate()
+        p.join()
+
+    time_elapsed = time.time() - start
+    solution = return_dict.get("solution")
+
+    return {
+        "status": "SAT" if solution else "UNKNOWN",
+        "time": time_elapsed,
+        "method": return_dict.get("method"),
+        "solution": solution,
+        "partial": return_dict.get("partial"),
+        "violations": return_dict.get("violations"),
+        "error": return_dict.get("error")
+    }
@@ -5,10 +5,15 @@ def write_experiment_output(exp_id, config, logical_graph, physical_graph,
                             num_vars, num_clauses, encoding_type,
                             solver_name, time_cnf, time_sat, status,
                             solution=None, solver_error=None,
-                            unsat_clauses=None, output_dir="outputs"):
+                            unsat_clauses=None, region=None, engine="sat",
+                            enumeration=None, size_model=None, output_dir="outputs"):
     """
     Scrive il risultato di un esperimento in JSON.
     Se il problema è UNSAT, include le clausole che generano UNSAT.
+    Se l'embedding è stato trovato in una regione di G_phys, include la finestra usata.
+    In modalità enumerazione, `enumeration` riassume quante soluzioni sono state trovate.
+    `size_model` riporta le stime di dimensione e l'encoding scelto.
+    `engine` indica quale motore ha prodotto la soluzione (sat, region, heuristic-*).
     """
     out = {
         "experiment_id": exp_id,
@@ -29,6 +34,7 @@ def write_experiment_output(exp_id, config, logical_graph, physical_graph,
         },
         "solver": {
             "name": solver_name,
+            "engine": engine,
             "status": status,
             "time_cnf_generation": time_cnf,
             "time_sat_solve": time_sat,
@@ -42,6 +48,15 @@ def write_experiment_output(exp_id, config, logical_graph, physical_graph,
     if solver_error is not None:
         out['solver']['error'] = solver_error
 
+    if region is not None:
+        out['region'] = region
+
+    if enumeration is not None:
+        out['enumeration'] = enumeration
+
+    if size_model is not None:
+        out['size_model'] = size_model
+
     if unsat_clauses is not None:
         # Convertiamo le clausole in lista di liste di interi
         out['solver']['unsat_clauses'] = [
@@ -0,0 +1,262 @@
+import os
+import time
+import tempfile
+from itertools import product
+
+import networkx as nx
+
+from cnf_generator import CNFGenerator
+from solver_interface import start_solver, finish_solver
+from size_model import select_encoding
+
+
+# ================================================================
+#  FILTRI SULLE FINESTRE
+# ================================================================
+def _can_host(G_log, W):
+    """
+    Condizioni necessarie (economiche) perché W possa ospitare G_log
+    con catene di lunghezza 1: abbastanza nodi, archi e grado massimo.
+    """
+    if W.number_of_nodes() < G_log.number_of_nodes():
+        return False
+    if W.number_of_edges() < G_log.number_of_edges():
+        return False
+    max_deg_log = max((d for _, d in G_log.degree()), default=0)
+    max_deg_win = max((d for _, d in W.degree()), default=0)
+    return max_deg_win >= max_deg_log
+
+
+# ================================================================
+#  GENERAZIONE DELLE REGIONI CANDIDATE
+# ================================================================
+#  Le finestre sono generate pigramente per livelli (lato del tassello /
+#  raggio della palla BFS) così da fermarsi appena ne esistono abbastanza,
+#  senza mai costruire finestre più grandi di max_size.
+# ================================================================
+
+# Fattore di default: finestre al più REGION_SIZE_FACTOR * |V_log| nodi
+REGION_SIZE_FACTOR = 4
+# Sopra questa dimensione la deduplica si affida solo a hash WL + gradi
+EXACT_ISO_MAX_NODES = 16
+
+
+def coordinate_tiles(G_phys, max_size=None):
+    """
+    Tassella il grafo fisico usando le etichette a coordinate.
+    - Funziona solo se tutti i nodi sono tuple della stessa lunghezza
+      (griglie, Chimera/Pegasus/Zephyr in coordinate).
+    - Le prime due coordinate identificano la cella; al livello `side` si
+      ottengono i blocchi side×side di celle adiacenti.
+    Generatore: produce, per side = 1, 2, ..., la lista di insiemi di nodi
+    di dimensione al più `max_size`; termina quando nessun blocco ci sta.
+    """
+    nodes = list(G_phys.nodes())
+    if not nodes or not all(isinstance(n, tuple) for n in nodes):
+        return
+    if len({len(n) for n in nodes}) != 1:
+        return
+
+    d = min(2, len(nodes[0]))
+    cells = {}
+    for n in nodes:
+        cells.setdefault(n[:d], []).append(n)
+
+    extents = [max(c[k] for c in cells) + 1 for k in range(d)]
+    for side in range(1, max(extents) + 1):
+        tiles = []
+        for origin in product(*[range(e) for e in extents]):
+            block = []
+            for offset in product(range(side), repeat=d):
+                cell = tuple(o + k for o, k in zip(origin, offset))
+                block.extend(cells.get(cell, []))
+            if block and (max_size is None or len(block) <= max_size):
+                tiles.append(frozenset(block))
+        if not tiles:
+            return
+        yield tiles
+
+
+def bfs_balls(G_phys, max_size=None):
+    """
+    Palle BFS attorno a ogni nodo fisico, espanse di un livello alla volta.
+    Generatore: produce, per r = 1, 2, ..., la lista delle palle di raggio r
+    che sono cresciute rispetto al livello precedente; una palla oltre
+    `max_size` nodi smette di crescere.
+    """
+    balls = {c: {c} for c in G_phys.nodes()}
+    frontier = {c: {c} for c in G_phys.nodes()}
+    while frontier:
+        level = []
+        for c in list(frontier):
+            layer = {v for u in frontier[c] for v in G_phys.neighbors(u)} - balls[c]
+            if not layer:
+                del frontier[c]
+                continue
+            balls[c] |= layer
+            if max_size is not None and len(balls[c]) > max_size:
+                del frontier[c]
+                continue
+            frontier[c] = layer
+            level.append(frozenset(balls[c]))
+        if level:
+            yield level
+
+
+def _dedup_key(W):
+    degrees = tuple(sorted(d for _, d in W.degree()))
+    return nx.weisfeiler_lehman_graph_hash(W), degrees
+
+
+def candidate_regions(G_log, G_phys, max_radius=None, max_windows=None, max_size=None):
+    """
+    Estrae sottografi connessi di G_phys candidati a ospitare G_log.
+    - Unisce tasselli per coordinate e palle BFS, livello per livello.
+    - Scarta le finestre troppo piccole, più grandi di `max_size`, non
+      connesse o uguali all'intero grafo.
+    - Deduplica per isomorfismo (finestre isomorfe hanno lo stesso esito SAT):
+      hash WL + sequenza dei gradi, con verifica esatta solo per finestre piccole.
+      Una collisione di hash può al più scartare una finestra candidata.
+    Le finestre sono ordinate per livello e, dentro il livello, per dimensione.
+    """
+    m = G_phys.number_of_nodes()
+    if max_size is None:
+        max_size = REGION_SIZE_FACTOR * G_log.number_of_nodes()
+    max_size = min(max_size, m - 1)
+
+    levels = [coordinate_tiles(G_phys, max_size), bfs_balls(G_phys, max_size)]
+    windows = []
+    seen_sets = set()
+    by_key = {}
+    level_idx = 0
+
+    while levels:
+        level_idx += 1
+        if max_radius is not None and level_idx > max_radius:
+            break
+
+        node_sets = []
+        for gen in list(levels):
+            batch = next(gen, None)
+            if batch is None:
+                levels.remove(gen)
+                continue
+            node_sets.extend(batch)
+
+        for nodes in sorted(set(node_sets) - seen_sets, key=lambda s: (len(s), sorted(map(str, s)))):
+            seen_sets.add(nodes)
+            W = G_phys.subgraph(nodes)
+            if not _can_host(G_log, W) or not nx.is_connected(W):
+                continue
+
+            key = _dedup_key(W)
+            same = by_key.setdefault(key, [])
+            if same and (len(W) > EXACT_ISO_MAX_NODES or any(nx.is_isomorphic(W, o) for o in same)):
+                continue
+            same.append(W)
+
+            windows.append(W)
+            if max_windows is not None and len(windows) >= max_windows:
+                return windows
+
+    return windows
+
+
+# ================================================================
+#  RISOLUZIONE DELLE FINESTRE
+# ================================================================
+def _start_window(G_log, W, allow_shared, work_dir, idx, encoding):
+    t0 = time.time()
+    encoding = select_encoding(G_log, W, allow_shared, requested=encoding)['encoding']
+    gen = CNFGenerator(G_log, W, allow_shared_physical=allow_shared, encoding=encoding)
+    num_vars, num_clauses = gen.generate()
+    dimacs_path = os.path.join(work_dir, f"window_{idx}.cnf")
+    gen.write_dimacs(dimacs_path)
+    t1 = time.time()
+
+    return {
+        "index": idx,
+        "nodes": sorted(W.nodes()),
+        "encoding": encoding,
+        "num_vars": num_vars,
+        "num_clauses": num_clauses,
+        "time_cnf": t1 - t0,
+        "gen": gen,
+        "handle": start_solver(dimacs_path, cnf_gen=gen),
+    }
+
+
+def _finish_window(job, reason="Timeout expired"):
+    res = finish_solver(job.pop("handle"), reason=reason)
+    gen = job.pop("gen")
+
+    solution_map = None
+    if res.get("status") == "SAT" and res.get("model"):
+        rev = {vid: (i, a) for (i, a), vid in gen.var_map.items()}
+        solution_map = dict(rev[lit] for lit in res["model"] if lit in rev)
+
+    job["status"] = res.get("status", "ERROR")
+    job["time_sat"] = res.get("time", 0.0)
+    job["solution"] = solution_map
+    return job
+
+
+def search_regions(G_log, G_phys, allow_shared=False, timeout=None,
+                   max_radius=None, max_windows=32, workers=None, encoding="auto",
+                   max_size=None, poll_seconds=0.01):
+    """
+    Prova a immergere G_log in piccole regioni di G_phys prima dell'intero grafo.
+    Le finestre, in ordine di dimensione, vengono risolte da al più `workers`
+    processi solver in parallelo, avviati e sorvegliati dal solo thread
+    principale; alla prima finestra SAT gli altri solver vengono terminati.
+    Con encoding="auto" ogni finestra usa l'encoding più economico stimato.
+
+    Restituisce un dizionario con la finestra vincente (o None) e le statistiche.
+    I tempi time_candidates / time_solve / time_total sono wall-clock; le somme
+    per finestra (window_time_*_sum) sono solo diagnostiche, perché le finestre
+    girano in parallelo e includono quelle interrotte.
+    """
+    t0 = time.time()
+    windows = candidate_regions(G_log, G_phys, max_radius=max_radius,
+                                max_windows=max_windows, max_size=max_size)
+    t1 = time.time()
+    workers = workers or os.cpu_count() or 1
+
+    pending = list(enumerate(windows))
+    running = []
+    tried = []
+    best = None
+    with tempfile.TemporaryDirectory() as work_dir:
+        while (pending or running) and best is None:
+            while pending and len(running) < workers:
+                k, W = pending.pop(0)
+                running.append(_start_window(G_log, W, allow_shared, work_dir, k, encoding))
+
+            time.sleep(poll_seconds)
+            for job in list(running):
+                proc = job["handle"]["process"]
+                expired = timeout is not None and time.time() - job["handle"]["start"] >= timeout
+                if proc.is_alive() and not expired:
+                    continue
+                running.remove(job)
+                job = _finish_window(job)
+                tried.append(job)
+                if job["status"] == "SAT" and job["solution"]:
+                    best = job
+                    break
+
+        # Una finestra è SAT: i solver ancora attivi non servono più
+        for job in running:
+            tried.append(_finish_window(job, reason="Interrupted"))
+    t2 = time.time()
+
+    return {
+        "num_candidates": len(windows),
+        "num_tried": len(tried),
+        "time_candidates": t1 - t0,
+        "time_solve": t2 - t1,
+        "time_total": t2 - t0,
+        "window_time_cnf_sum": sum(r["time_cnf"] for r in tried),
+        "window_time_sat_sum": sum(r["time_sat"] for r in tried),
+        "best": best,
+    }
@@ -0,0 +1,132 @@
+from cnf_generator import ENCODINGS
+
+# ================================================================
+#  MODELLO DI DIMENSIONE DELLA CNF
+# ================================================================
+#  Stima, prima della generazione, variabili, clausole e letterali di
+#  ciascun encoding a partire da n, m, |E_log| e |E_phys| (conteggi esatti),
+#  e da questi la memoria di picco: liste Python in CNFGenerator, rilettura
+#  del DIMACS e Glucose4 con un'assumption per clausola nel processo solver.
+#  I conteggi sono esatti (verificati in tests/test_size_model.py).
+#
+#  I coefficienti di memoria sono una stima grossolana, ricavata così
+#  (CPython 3.11, python-sat 1.9, Linux): per ogni encoding si è generata
+#  la CNF, letto ru_maxrss del processo padre dopo generate() e
+#  RUSAGE_CHILDREN dopo solve_dimacs_file(). Picchi osservati (padre/figlio):
+#    scalefree11 → chimera4x4x4, pairwise   378699 cl.  97 / 603 MB
+#    scalefree11 → chimera4x4x4, support    101067 cl.  55 / 107 MB
+#    scalefree11 → chimera4x4x4, sequential  12511 cl.  41 /  47 MB
+#    random8 → pegasus2, pairwise             20088 cl.  42 /  44 MB
+#  Il figlio (rilettura DIMACS + Glucose4 con un'assumption per clausola +
+#  clausole apprese) costa ~0.7-1.5 KB per clausola; BYTES_PER_CLAUSE sta
+#  nella parte alta dell'intervallo. BASE_MEMORY_MB copre interprete e
+#  librerie di padre e figlio (~40 + ~35 MB). Da ricalibrare se cambiano
+#  solver o versione di Python.
+# ================================================================
+
+BYTES_PER_CLAUSE = 1400
+BYTES_PER_LITERAL = 60
+BASE_MEMORY_MB = 80
+
+
+def _pairwise_amo(k):
+    """(aux, clausole, letterali) per at-most-one a coppie su k letterali"""
+    c = k * (k - 1) // 2
+    return 0, c, 2 * c
+
+
+def _sequential_amo(k):
+    """(aux, clausole, letterali) per at-most-one con contatore sequenziale"""
+    if k < 3:
+        return _pairwise_amo(k)
+    return k - 1, 3 * k - 4, 2 * (3 * k - 4)
+
+
+def estimate_size(n, m, e_log, e_phys, encoding="pairwise", allow_shared=False):
+    """
+    Restituisce un dizionario con num_variables, num_clauses, num_literals
+    e memory_mb stimati per l'encoding dato.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Encoding non valido: {encoding}")
+
+    amo = _sequential_amo if encoding == "sequential" else _pairwise_amo
+
+    num_vars = n * m
+    # exactly-one per ogni nodo logico
+    num_clauses = n
+    num_literals = n * m
+    aux, c, l = amo(m)
+    num_vars += n * aux
+    num_clauses += n * c
+    num_literals += n * l
+
+    # mutua esclusione sui nodi fisici
+    if not allow_shared:
+        aux, c, l = amo(n)
+        num_vars += m * aux
+        num_clauses += m * c
+        num_literals += m * l
+
+    # edge consistency
+    if encoding == "pairwise":
+        c = e_log * (m * m - 2 * e_phys)
+        num_clauses += c
+        num_literals += 2 * c
+    else:
+        num_clauses += 2 * e_log * m
+        num_literals += 2 * e_log * (m + 2 * e_phys)
+
+    memory = BASE_MEMORY_MB * 2 ** 20 + num_clauses * BYTES_PER_CLAUSE + num_literals * BYTES_PER_LITERAL
+
+    return {
+        "encoding": encoding,
+        "num_variables": num_vars,
+        "num_clauses": num_clauses,
+        "num_literals": num_literals,
+        "memory_mb": memory / 2 ** 20
+    }
+
+
+def estimate_all(G_log, G_phys, allow_shared=False):
+    n, m = G_log.number_of_nodes(), G_phys.number_of_nodes()
+    e_log, e_phys = G_log.number_of_edges(), G_phys.number_of_edges()
+    return {enc: estimate_size(n, m, e_log, e_phys, enc, allow_shared) for enc in ENCODINGS}
+
+
+# ================================================================
+#  SCELTA AUTOMATICA DELL'ENCODING
+# ================================================================
+def select_encoding(G_log, G_phys, allow_shared=False, requested="auto", max_memory_mb=None):
+    """
+    Sceglie l'encoding da usare.
+    - requested="auto": il più economico in memoria stimata.
+    - encoding esplicito: viene rispettato se sta sotto max_memory_mb,
+      altrimenti si ripiega sul più economico (downgraded=True).
+    - Se nemmeno il più economico sta sotto il tetto: refused=True, encoding=None.
+    """
+    estimates = estimate_all(G_log, G_phys, allow_shared)
+    cheapest = min(ENCODINGS, key=lambda e: estimates[e]["memory_mb"])
+
+    if requested in (None, "auto"):
+        chosen = cheapest
+    elif requested in ENCODINGS:
+        chosen = requested
+    else:
+        raise ValueError(f"Encoding non valido: {requested}")
+
+    downgraded = False
+    refused = False
+    if max_memory_mb is not None and estimates[chosen]["memory_mb"] > max_memory_mb:
+        if estimates[cheapest]["memory_mb"] <= max_memory_mb:
+            chosen, downgraded = cheapest, True
+        else:
+            chosen, refused = None, True
+
+    return {
+        "encoding": chosen,
+        "estimate": estimates[chosen] if chosen else None,
+        "estimates": estimates,
+        "downgraded": downgraded,
+        "refused": refused
+    }
@@ -4,8 +4,35 @@ import traceback
 from pysat.solvers import Glucose4
 from pysat.formula import CNF
 
-def _solve_process(dimacs_path, cnf_gen, assumptions, return_dict):
+try:
+    import resource  # non disponibile su Windows
+except ImportError:
+    resource = None
+
+
+def _address_space_bytes():
+    """Spazio di indirizzamento attuale del processo (solo Linux, altrimenti 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def limit_address_space(memory_limit_mb):
+    """
+    Impone RLIMIT_AS al processo corrente (da chiamare nel processo figlio):
+    il limite si somma a quanto già ereditato dal fork del processo padre.
+    Non fa nulla se memory_limit_mb è None o su Windows.
+    """
+    if memory_limit_mb and resource is not None:
+        limit = _address_space_bytes() + int(memory_limit_mb * 2 ** 20)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _solve_process(dimacs_path, cnf_gen, assumptions, phases, memory_limit_mb, return_dict):
     try:
+        # Tetto sullo spazio di indirizzamento del processo solver
+        limit_address_space(memory_limit_mb)
+
         cnf = CNF(from_file=dimacs_path)
         solver = Glucose4(use_timer=True)
 
@@ -14,6 +41,10 @@ def _solve_process(dimacs_path, cnf_gen, assumptions, return_dict):
             aux_lit = cnf_gen.num_vars + idx + 1
             # (¬a_i ∨ C_i)
             solver.add_clause([-aux_lit] + clause)
+
+        # Warm start: polarità iniziali suggerite (es. dall'euristica)
+        if phases:
+            solver.set_phases(phases)
        
         # Ritorna true se SAT, False se UNSAT
         sat = solver.solve(assumptions=assumptions)
@@ -39,10 +70,11 @@ def _solve_process(dimacs_path, cnf_gen, assumptions, return_dict):
         return_dict["error"] = traceback.format_exc()
 
 
-def solve_dimacs_file(dimacs_path, timeout_seconds=None, cnf_gen=None):
+def start_solver(dimacs_path, cnf_gen=None, phases=None, memory_limit_mb=None):
     """
-    Risolve un file DIMACS con timeout funzionante su Windows.
-    Usa assumptions per UNSAT core.
+    Avvia il solver in un processo separato senza attenderlo.
+    Restituisce un handle da passare a finish_solver; va chiamato dal thread
+    principale (fork da un processo multithread non è sicuro).
     """
     manager = mp.Manager()
     return_dict = manager.dict()
@@ -55,23 +87,70 @@ def solve_dimacs_file(dimacs_path, timeout_seconds=None, cnf_gen=None):
             assumptions.append(aux_lit)
 
     # Lancia solver in un processo separato
-    p = mp.Process(target=_solve_process, args=(dimacs_path, cnf_gen, assumptions, return_dict))
+    p = mp.Process(target=_solve_process, args=(dimacs_path, cnf_gen, assumptions, phases, memory_limit_mb, return_dict))
     start = time.time()
     p.start()
-    p.join(timeout_seconds)
 
-    time_elapsed = time.time() - start
+    return {
+        "process": p,
+        "manager": manager,
+        "return_dict": return_dict,
+        "cnf_gen": cnf_gen,
+        "start": start
+    }
+
+
+def solve_dimacs_file(dimacs_path, timeout_seconds=None, cnf_gen=None, phases=None,
+                      memory_limit_mb=None):
+    """
+    Risolve un file DIMACS con timeout funzionante su Windows.
+    Usa assumptions per UNSAT core.
+    `phases` (lista di letterali) imposta le polarità iniziali del solver.
+    `memory_limit_mb` impone RLIMIT_AS al processo solver (ignorato su Windows).
+    """
+    handle = start_solver(dimacs_path, cnf_gen=cnf_gen, phases=phases,
+                          memory_limit_mb=memory_limit_mb)
+    handle["process"].join(timeout_seconds)
+    return finish_solver(handle)
+
+
+def finish_solver(handle, reason="Timeout expired"):
+    """
+    Raccoglie il risultato di un solver avviato con start_solver.
+    Se il processo è ancora vivo viene terminato e l'errore riporta `reason`.
+    """
+    p = handle["process"]
+    return_dict = handle["return_dict"]
+    cnf_gen = handle["cnf_gen"]
+    time_elapsed = time.time() - handle["start"]
 
     if p.is_alive():
-        # Timeout → kill!
+        # Timeout (o interruzione richiesta) → kill!
         p.terminate()
         p.join()
+        handle["manager"].shutdown()
+        return {
+            "status": "ERROR",
+            "time": time_elapsed,
+            "model": None,
+            "unsat_core": None,
+            "error": reason
+        }
+
+    result = _decode_result(p, return_dict, cnf_gen, time_elapsed)
+    handle["manager"].shutdown()
+    return result
+
+
+def _decode_result(p, return_dict, cnf_gen, time_elapsed):
+    # Processo morto senza risultato (es. std::bad_alloc sotto RLIMIT_AS)
+    if "status" not in return_dict:
         return {
             "status": "ERROR",
             "time": time_elapsed,
             "model": None,
             "unsat_core": None,
-            "error": "Timeout expired"
+            "error": f"Solver process crashed (exit code {p.exitcode})"
         }
 
     # Solver terminato
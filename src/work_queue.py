@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+import yaml
+
+from experiment_runner import run_experiment
+from utils import ensure_dir
+
+# ================================================================
+#  CODA DI ESPERIMENTI SU FILE SQLITE
+# ================================================================
+#  Il file .sqlite può stare su uno storage condiviso: ogni worker,
+#  su qualsiasi host, prende un job in "lease" per un certo tempo e
+#  lo rinnova con un heartbeat. I lease scaduti tornano in coda.
+#  Il JSON del risultato viene salvato nella coda stessa, così il
+#  producer lo recupera con "collect" senza accedere agli host dei worker.
+# ================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    exp_id        INTEGER,
+    config        TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    worker        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result        TEXT,
+    error         TEXT,
+    created       REAL NOT NULL,
+    updated       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_exp_id ON jobs (exp_id);
+"""
+
+
+class JobQueue:
+    def __init__(self, path, timeout=60.0):
+        self.path = path
+        # isolation_level=None: le transazioni sono gestite a mano (BEGIN IMMEDIATE)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, fn):
+        """Esegue fn(cur) in una transazione con lock in scrittura."""
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            out = fn(cur)
+            cur.execute("COMMIT")
+            return out
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+
+    # ----------------------------------------------------------------------
+    # Producer
+    # ----------------------------------------------------------------------
+    def enqueue(self, experiments):
+        """Accoda gli esperimenti; quelli con un exp_id già presente vengono ignorati."""
+        now = time.time()
+
+        def fn(cur):
+            added = 0
+            for cfg in experiments:
+                added += cur.execute(
+                    "INSERT OR IGNORE INTO jobs (exp_id, config, created, updated) VALUES (?, ?, ?, ?)",
+                    (cfg.get('id', 0), json.dumps(cfg), now, now)
+                ).rowcount
+            return added
+
+        return self._transaction(fn)
+
+    # ----------------------------------------------------------------------
+    # Worker
+    # ----------------------------------------------------------------------
+    def requeue_expired(self, max_attempts=3):
+        """
+        Rimette in coda i job il cui lease è scaduto (worker morto o bloccato).
+        Un job che ha già esaurito max_attempts (es. uccide ogni worker per OOM)
+        passa a 'failed'.
+        """
+        now = time.time()
+        return self._transaction(lambda cur: cur.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, error = 'lease expired', updated = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (max_attempts, now, now)
+        ).rowcount)
+
+    def lease(self, worker_id, lease_seconds):
+        """Prende il primo job in attesa; restituisce (job_id, cfg) oppure None."""
+        def fn(cur):
+            row = cur.execute(
+                "SELECT id, config FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            cur.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row[0])
+            )
+            return row[0], json.loads(row[1])
+
+        return self._transaction(fn)
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        """Rinnova il lease; False se il job non appartiene più a questo worker."""
+        now = time.time()
+        return self._transaction(lambda cur: cur.execute(
+            "UPDATE jobs SET lease_expires = ?, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker_id)
+        ).rowcount) == 1
+
+    def complete(self, job_id, worker_id, result):
+        """Segna il job come completato; `result` è il JSON dell'esperimento."""
+        now = time.time()
+        return self._transaction(lambda cur: cur.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (result, now, job_id, worker_id)
+        ).rowcount) == 1
+
+    def fail(self, job_id, worker_id, error, max_attempts=3):
+        """Registra l'errore; il job torna in coda finché non supera max_attempts."""
+        now = time.time()
+        return self._transaction(lambda cur: cur.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (max_attempts, error, now, job_id, worker_id)
+        ).rowcount) == 1
+
+    def results(self):
+        """Coppie (exp_id, JSON del risultato) dei job completati."""
+        return self.conn.execute(
+            "SELECT exp_id, result FROM jobs WHERE status = 'done' ORDER BY exp_id"
+        ).fetchall()
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+# ================================================================
+#  HEARTBEAT IN BACKGROUND
+# ================================================================
+def _heartbeat_loop(db_path, job_id, worker_id, lease_seconds, stop):
+    # Connessione dedicata: gli oggetti sqlite3 non si condividono tra thread
+    queue = JobQueue(db_path)
+    try:
+        while not stop.wait(lease_seconds / 3.0):
+            if not queue.heartbeat(job_id, worker_id, lease_seconds):
+                print(f"[WARN] Lease perso per il job {job_id}")
+                break
+    finally:
+        queue.close()
+
+
+def run_worker(db_path, worker_id=None, lease_seconds=300, poll_seconds=5, max_attempts=3, exit_when_empty=True):
+    """
+    Worker senza stato: prende job dalla coda, esegue run_experiment
+    e registra il risultato, finché la coda non è vuota.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path)
+    ensure_dir("outputs")
+
+    try:
+        while True:
+            queue.requeue_expired(max_attempts=max_attempts)
+            job = queue.lease(worker_id, lease_seconds)
+
+            if job is None:
+                counts = queue.counts()
+                if exit_when_empty and not counts.get('pending') and not counts.get('leased'):
+                    print(f"[INFO] Coda vuota, worker {worker_id} termina")
+                    return
+                time.sleep(poll_seconds)
+                continue
+
+            job_id, cfg = job
+            print(f"[INFO] Worker {worker_id}: job {job_id} (esperimento {cfg.get('id', 0)})")
+
+            stop = threading.Event()
+            hb = threading.Thread(target=_heartbeat_loop,
+                                  args=(db_path, job_id, worker_id, lease_seconds, stop),
+                                  daemon=True)
+            hb.start()
+            try:
+                out_file = run_experiment(cfg)
+            except Exception:
+                stop.set()
+                hb.join()
+                queue.fail(job_id, worker_id, traceback.format_exc(), max_attempts=max_attempts)
+                print(f"[ERROR] Job {job_id} fallito")
+                continue
+
+            stop.set()
+            hb.join()
+            with open(out_file, "r") as f:
+                result = f.read()
+            if not queue.complete(job_id, worker_id, result):
+                print(f"[WARN] Job {job_id} completato dopo la scadenza del lease")
+    finally:
+        queue.close()
+
+
+# ================================================================
+#  ENTRY POINT
+# ================================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=str, default="queue.sqlite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enq = sub.add_parser("enqueue")
+    p_enq.add_argument("--config", type=str, default="config.yaml")
+
+    p_work = sub.add_parser("worker")
+    p_work.add_argument("--worker-id", type=str, default=None)
+    p_work.add_argument("--lease-seconds", type=float, default=300)
+    p_work.add_argument("--poll-seconds", type=float, default=5)
+    p_work.add_argument("--max-attempts", type=int, default=3)
+    p_work.add_argument("--keep-alive", action="store_true",
+                        help="non terminare quando la coda è vuota")
+
+    p_collect = sub.add_parser("collect")
+    p_collect.add_argument("--output-dir", type=str, default="outputs")
+
+    sub.add_parser("status")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        with open(args.config, "r") as f:
+            cfg_all = yaml.safe_load(f)
+        queue = JobQueue(args.db)
+        n = queue.enqueue(cfg_all.get("experiments", []))
+        queue.close()
+        print(f"[INFO] Accodati {n} esperimenti in {args.db} (duplicati ignorati)")
+
+    elif args.command == "worker":
+        run_worker(args.db, worker_id=args.worker_id, lease_seconds=args.lease_seconds,
+                   poll_seconds=args.poll_seconds, max_attempts=args.max_attempts,
+                   exit_when_empty=not args.keep_alive)
+
+    elif args.command == "collect":
+        queue = JobQueue(args.db)
+        rows = queue.results()
+        queue.close()
+        for exp_id, result in rows:
+            exp_dir = os.path.join(args.output_dir, str(exp_id))
+            ensure_dir(exp_dir)
+            with open(os.path.join(exp_dir, f"experiment_{exp_id:03d}.json"), "w") as f:
+                f.write(result)
+        print(f"[INFO] Raccolti {len(rows)} risultati in {args.output_dir}")
+
+    elif args.command == "status":
+        queue = JobQueue(args.db)
+        for status, n in sorted(queue.counts().items()):
+            print(f"{status}: {n}")
+        queue.close()
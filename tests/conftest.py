@@ -0,0 +1,5 @@
+import os
+import sys
+
+# I moduli in src/ si importano tra loro come moduli top-level
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from parser import read_graph
+from cnf_generator import CNFGenerator, ENCODINGS
+from enumerate_embeddings import enumerate_embeddings
+from size_model import estimate_size, select_encoding
+
+GRAPHS = os.path.join(os.path.dirname(__file__), "..", "graphs")
+
+
+def load(name):
+    return read_graph(os.path.join(GRAPHS, f"{name}.txt"))
+
+
+# (logico, fisico, allow_shared, numero di embedding)
+PAIRS = [
+    ("smallword4", "chimera1x1x4", False, 192),
+    ("griglia2x2", "griglia3x3", False, 32),
+    ("path6", "griglia2x3x4", False, 6096),
+    ("clique5", "griglia3x3", False, 0),
+    ("stella4", "griglia2x2", True, 64),
+    ("albero4", "clique5", True, 320),
+]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("log_name,phys_name,allow_shared,_", PAIRS + [("random8", "pegasus2", False, None)])
+def test_estimate_matches_generator(log_name, phys_name, allow_shared, _, encoding):
+    G_log, G_phys = load(log_name), load(phys_name)
+    gen = CNFGenerator(G_log, G_phys, allow_shared_physical=allow_shared, encoding=encoding)
+    num_vars, num_clauses = gen.generate()
+
+    est = estimate_size(G_log.number_of_nodes(), G_phys.number_of_nodes(),
+                        G_log.number_of_edges(), G_phys.number_of_edges(),
+                        encoding, allow_shared)
+
+    assert est["num_variables"] == num_vars
+    assert est["num_clauses"] == num_clauses
+    assert est["num_literals"] == sum(len(c) for c in gen.clauses)
+
+
+@pytest.mark.parametrize("log_name,phys_name,allow_shared,expected", PAIRS)
+def test_encodings_have_same_embeddings(log_name, phys_name, allow_shared, expected):
+    G_log, G_phys = load(log_name), load(phys_name)
+    for encoding in ENCODINGS:
+        gen = CNFGenerator(G_log, G_phys, allow_shared_physical=allow_shared, encoding=encoding)
+        gen.generate()
+        assert sum(1 for _ in enumerate_embeddings(gen)) == expected, encoding
+
+
+def test_select_encoding_respects_memory_ceiling():
+    G_log, G_phys = load("scalefree11"), load("chimera4x4x4")
+
+    sel = select_encoding(G_log, G_phys, requested="pairwise", max_memory_mb=300)
+    assert sel["downgraded"] and sel["encoding"] != "pairwise"
+    assert sel["estimate"]["memory_mb"] <= 300
+
+    sel = select_encoding(G_log, G_phys, max_memory_mb=1)
+    assert sel["refused"] and sel["encoding"] is None
@@ -0,0 +1,69 @@
+import pytest
+
+from work_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.sqlite"))
+    yield q
+    q.close()
+
+
+def job_row(queue, job_id):
+    return queue.conn.execute(
+        "SELECT status, worker, attempts, error FROM jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+
+
+def test_enqueue_is_idempotent(queue):
+    experiments = [{"id": 1, "logical_graph": "a"}, {"id": 2, "logical_graph": "b"}]
+
+    assert queue.enqueue(experiments) == 2
+    assert queue.enqueue(experiments) == 0
+    assert queue.counts() == {"pending": 2}
+
+
+def test_expired_lease_goes_back_to_pending_then_failed(queue):
+    queue.enqueue([{"id": 1}])
+
+    for attempt in (1, 2):
+        # lease_seconds negativo: il lease è già scaduto
+        job_id, cfg = queue.lease("w1", -1)
+        assert cfg == {"id": 1}
+        assert queue.requeue_expired(max_attempts=3) == 1
+        assert job_row(queue, job_id) == ("pending", None, attempt, "lease expired")
+
+    job_id, _ = queue.lease("w1", -1)
+    assert queue.requeue_expired(max_attempts=3) == 1
+    assert job_row(queue, job_id) == ("failed", None, 3, "lease expired")
+    assert queue.lease("w1", 60) is None
+
+
+def test_requeue_ignores_live_leases(queue):
+    queue.enqueue([{"id": 1}])
+    job_id, _ = queue.lease("w1", 60)
+
+    assert queue.requeue_expired() == 0
+    assert job_row(queue, job_id)[0] == "leased"
+
+
+def test_lost_lease_rejects_heartbeat_and_complete(queue):
+    queue.enqueue([{"id": 1}])
+    job_id, _ = queue.lease("w1", -1)
+    queue.requeue_expired()
+
+    # Lease scaduto e job tornato in coda
+    assert not queue.heartbeat(job_id, "w1", 60)
+    assert not queue.complete(job_id, "w1", "{}")
+
+    # Ora il job appartiene a un altro worker
+    assert queue.lease("w2", 60)[0] == job_id
+    assert not queue.heartbeat(job_id, "w1", 60)
+    assert not queue.complete(job_id, "w1", "{}")
+    assert not queue.fail(job_id, "w1", "boom")
+
+    assert queue.heartbeat(job_id, "w2", 60)
+    assert queue.complete(job_id, "w2", '{"status": "SAT"}')
+    assert job_row(queue, job_id) == ("done", "w2", 2, None)
+    assert queue.results() == [(1, '{"status": "SAT"}')]